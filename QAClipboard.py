@@ -1,12 +1,959 @@
 """
 Program for automatic A giver in terms of Q
+
+Only pyperclip is required. The following optional dependencies are used when installed:
+    ijson: stream-parses JSON QA files without reading them into memory as a whole
+    marisa-trie: holds QA tables larger than ClipboardMonitor.TRIE_THRESHOLD in a compact trie
+    python-xlib: reads the X11 clipboard and waits for XFixes change notifications directly
+    pyobjc: watches NSPasteboard.changeCount on macOS
+    Cython: builds the _qa_fast extension with python setup.py build_ext --inplace
 """
 
 from __future__ import annotations
+import ast
+from array import array
+import asyncio
+import contextlib
+import importlib.util
+import itertools
+import json
+import os
+import select
+import signal
+import shutil
+import subprocess
+import sys
+import threading
 import time
 import pyperclip
-from typing import Any, NoReturn, Final
-import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, NoReturn, Final
+import marshal
+import mmap
+from functools import lru_cache
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import marisa_trie
+except ImportError:
+    marisa_trie = None
+
+try:
+    from _qa_fast import FastMonitor
+except ImportError:
+    FastMonitor = None
+
+
+class _Backend:
+
+    """
+    Base class for the sources of clipboard-change notifications.
+
+    A backend blocks in wait_for_change() until the OS reports that the clipboard contents may have changed, so the
+    monitor only reads the clipboard when there is something new to read. A backend is used for a single run: once
+    closed, it stops reporting changes and cannot be reopened.
+
+    Methods:
+        for_platform: Picks the most suitable backend available on the running system.
+        wait_for_change: Blocks until the clipboard changes.
+        close: Stops the backend and wakes up a pending wait_for_change().
+        events: Yields once per clipboard change.
+        async_events: Asynchronously yields once per clipboard change.
+        report: Tells the backend whether the last reported change turned out to be a real one.
+    """
+
+    def __init__(self) -> None:
+
+        """
+        Initializes the backend as open.
+        """
+
+        self.__closed = threading.Event()
+
+    @staticmethod
+    def for_platform() -> _Backend:
+
+        """
+        Picks the most suitable backend available on the running system.
+
+        Returns:
+            _Backend: The native backend of the platform, or _PollingBackend if it cannot be set up.
+        """
+
+        candidates: list[type[_Backend]] = []
+        if sys.platform == 'win32':
+            candidates.append(_Win32Backend)
+        elif sys.platform == 'darwin':
+            candidates.append(_MacBackend)
+        else:
+            if os.environ.get('WAYLAND_DISPLAY'):
+                candidates.append(_WaylandBackend)
+            if os.environ.get('DISPLAY'):
+                candidates.append(_X11Backend)
+
+        for candidate in candidates:
+            try:
+                return candidate()
+            except (ImportError, OSError):
+                continue
+        return _PollingBackend()
+
+    @property
+    def closed(self) -> bool:
+
+        """
+        Getter for whether the backend has been closed.
+
+        Returns:
+            bool: True once close() has been called.
+        """
+
+        return self.__closed.is_set()
+
+    def close(self) -> None:
+
+        """
+        Stops the backend and wakes up a wait_for_change() blocked on another thread. Safe to call from any thread and
+        more than once. The resources are released by events() on the thread that waited on them.
+        """
+
+        self.__closed.set()
+
+    def _sleep(self, timeout: float) -> None:
+
+        """
+        Sleeps for the timeout in seconds, or less if the backend is closed meanwhile.
+        """
+
+        self.__closed.wait(timeout)
+
+    def _release(self) -> None:
+
+        """
+        Releases the resources of the backend. Called once by events(), on the thread that waited on the backend.
+        """
+
+    def wait_for_change(self) -> None:
+
+        """
+        Blocks until the clipboard changes, or returns early once the backend is closed.
+        """
+
+        raise NotImplementedError
+
+    def report(self, changed: bool) -> None:
+
+        """
+        Tells the backend whether the last reported change turned out to be a real one. Native backends only report
+        real changes, so this does nothing by default.
+        """
+
+    def events(self) -> Iterator[None]:
+
+        """
+        Yields once per clipboard change, until the backend is closed. The resources of the backend are released when
+        the iteration ends.
+        """
+
+        try:
+            while not self.closed:
+                self.wait_for_change()
+                if self.closed:
+                    return
+                yield
+        finally:
+            self._release()
+
+    async def async_events(self) -> AsyncIterator[None]:
+
+        """
+        Asynchronously yields once per clipboard change.
+
+        The blocking events() iterator is consumed on a dedicated daemon thread, which forwards every change to the
+        running event loop. A single thread is used because some backends must be waited on from the thread that set
+        them up, and a daemon one because a thread blocked in the OS must not keep the interpreter from exiting.
+        After reporting a change, the thread waits until the consumer has handled it before waiting for the next one,
+        so report() always takes effect on the very next wait. Changes reported while the consumer is busy are
+        coalesced into one. The backend is closed, and the thread stops, when the iteration ends.
+
+        Raises:
+            Exception: Re-raises any exception raised by the backend on the watching thread.
+        """
+
+        loop = asyncio.get_running_loop()
+        changed = asyncio.Event()
+        handled = threading.Event()
+        failure: list[Exception] = []
+
+        def notify() -> None:
+            try:
+                loop.call_soon_threadsafe(changed.set)
+            except RuntimeError:  # The event loop has been closed
+                self.close()
+
+        def watch() -> None:
+            try:
+                with contextlib.closing(self.events()) as events:
+                    for _ in events:
+                        handled.clear()
+                        notify()
+                        handled.wait()
+            except Exception as e:
+                if not self.closed:
+                    failure.append(e)
+                    notify()
+
+        threading.Thread(target=watch, name=f"{type(self).__name__}-watcher", daemon=True).start()
+        try:
+            while True:
+                await changed.wait()
+                changed.clear()
+                if failure:
+                    raise failure[0]
+                yield
+                handled.set()
+        finally:
+            self.close()
+            handled.set()
+
+
+class _PollingBackend(_Backend):
+
+    """
+    Fallback backend used when no native notification mechanism is available. It reports a possible change on every
+    polling tick, leaving the actual comparison to the monitor.
+
+    The polling interval backs off from MIN_DELAY up to MAX_DELAY while the clipboard stays unchanged, and snaps back
+    to MIN_DELAY as soon as a change is observed, which keeps idle wakeups rare and active use responsive.
+    """
+
+    MIN_DELAY: Final[float] = 0.05
+    MAX_DELAY: Final[float] = 2.0
+    BACK_OFF: Final[float] = 1.5
+
+    def __init__(self) -> None:
+
+        """
+        Initializes the backend with the shortest polling interval.
+        """
+
+        super().__init__()
+        self.__delay: float = self.MIN_DELAY
+
+    def report(self, changed: bool) -> None:
+
+        """
+        Resets the polling interval on a change, and lengthens it otherwise.
+        """
+
+        self.__delay = self.MIN_DELAY if changed else min(self.__delay * self.BACK_OFF, self.MAX_DELAY)
+
+    def wait_for_change(self) -> None:
+
+        """
+        Waits for the next polling tick.
+        """
+
+        self._sleep(self.__delay)
+
+
+class _Win32Backend(_Backend):
+
+    """
+    Windows backend. Registers a hidden message-only window with AddClipboardFormatListener and blocks in GetMessageW
+    until WM_CLIPBOARDUPDATE arrives.
+
+    The window is created lazily on the first wait_for_change() call, because a window only receives messages on the
+    thread that created it.
+    """
+
+    WM_NULL: Final[int] = 0x0000
+    WM_CLIPBOARDUPDATE: Final[int] = 0x031D
+    HWND_MESSAGE: Final[int] = -3
+
+    def __init__(self) -> None:
+
+        """
+        Binds the user32 functions used by the backend.
+
+        Raises:
+            ImportError: Raises this exception if the Windows API is not available.
+        """
+
+        import ctypes
+        from ctypes import wintypes
+
+        super().__init__()
+        self.__ctypes = ctypes
+        self.__user32 = user32 = ctypes.WinDLL('user32', use_last_error=True)
+        self.__lock = threading.Lock()
+        user32.CreateWindowExW.argtypes = [
+            wintypes.DWORD, wintypes.LPCWSTR, wintypes.LPCWSTR, wintypes.DWORD, ctypes.c_int, ctypes.c_int,
+            ctypes.c_int, ctypes.c_int, wintypes.HWND, wintypes.HMENU, wintypes.HINSTANCE, wintypes.LPVOID
+        ]
+        user32.CreateWindowExW.restype = wintypes.HWND
+        user32.AddClipboardFormatListener.argtypes = [wintypes.HWND]
+        user32.AddClipboardFormatListener.restype = wintypes.BOOL
+        user32.RemoveClipboardFormatListener.argtypes = [wintypes.HWND]
+        user32.RemoveClipboardFormatListener.restype = wintypes.BOOL
+        user32.DestroyWindow.argtypes = [wintypes.HWND]
+        user32.DestroyWindow.restype = wintypes.BOOL
+        user32.PostMessageW.argtypes = [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+        user32.PostMessageW.restype = wintypes.BOOL
+        user32.GetMessageW.argtypes = [ctypes.POINTER(wintypes.MSG), wintypes.HWND, wintypes.UINT, wintypes.UINT]
+        user32.GetMessageW.restype = wintypes.BOOL
+        self.__msg = wintypes.MSG()
+        self.__hwnd: int | None = None
+
+    def __open(self) -> None:
+
+        """
+        Creates the message-only window and subscribes it to clipboard updates.
+
+        Raises:
+            OSError: Raises this exception if the window cannot be created or registered as a clipboard listener.
+        """
+
+        user32 = self.__user32
+        hwnd = user32.CreateWindowExW(0, 'STATIC', None, 0, 0, 0, 0, 0, self.HWND_MESSAGE, None, None, None)
+        if not hwnd:
+            raise self.__ctypes.WinError(self.__ctypes.get_last_error())
+        self.__hwnd = hwnd
+        if not user32.AddClipboardFormatListener(hwnd):
+            raise self.__ctypes.WinError(self.__ctypes.get_last_error())
+
+    def close(self) -> None:
+
+        """
+        Stops the backend, posting WM_NULL to the window to wake up a pending GetMessageW.
+        """
+
+        with self.__lock:
+            super().close()
+            if self.__hwnd is not None:
+                self.__user32.PostMessageW(self.__hwnd, self.WM_NULL, 0, 0)
+
+    def _release(self) -> None:
+
+        """
+        Unregisters and destroys the window on the thread that created it.
+        """
+
+        with self.__lock:
+            if (hwnd := self.__hwnd) is None:
+                return
+            self.__hwnd = None
+        self.__user32.RemoveClipboardFormatListener(hwnd)
+        self.__user32.DestroyWindow(hwnd)
+
+    def wait_for_change(self) -> None:
+
+        """
+        Pumps the window's message queue until WM_CLIPBOARDUPDATE is received or the backend is closed.
+
+        Raises:
+            OSError: Raises this exception if the message loop fails or is closed.
+        """
+
+        with self.__lock:  # Creating the window under the lock lets close() either see it or be seen by it
+            if self.closed:
+                return
+            if self.__hwnd is None:
+                self.__open()
+
+        msg_ref = self.__ctypes.byref(self.__msg)
+        while self.__user32.GetMessageW(msg_ref, self.__hwnd, 0, 0) > 0:
+            if self.closed or self.__msg.message == self.WM_CLIPBOARDUPDATE:
+                return
+        raise self.__ctypes.WinError(self.__ctypes.get_last_error())
+
+
+class _X11Backend(_Backend):
+
+    """
+    X11 backend. Subscribes to XFixes SetSelectionOwnerNotify events for the CLIPBOARD selection through python-xlib.
+    """
+
+    def __init__(self) -> None:
+
+        """
+        Opens the display connection and selects the CLIPBOARD ownership notifications.
+
+        Raises:
+            ImportError: Raises this exception if python-xlib is not installed.
+            OSError: Raises this exception if the display cannot be opened.
+        """
+
+        from Xlib import display, error
+        from Xlib.ext import xfixes
+
+        super().__init__()
+        try:
+            self.__display = display.Display()
+        except error.DisplayError as e:
+            raise OSError(f"Cannot open the X display:\n{e}") from e
+        if not self.__display.has_extension('XFIXES'):
+            self.__display.close()
+            raise OSError("The X server does not support the XFIXES extension.")
+        self.__lock = threading.Lock()
+        self.__wake_read, self.__wake_write = os.pipe()  # Lets close() interrupt the wait for X events
+
+        self.__display.xfixes_query_version()
+        self.__display.xfixes_select_selection_input(
+            self.__display.screen().root,
+            self.__display.intern_atom('CLIPBOARD'),
+            xfixes.XFixesSetSelectionOwnerNotifyMask
+        )
+
+    def wait_for_change(self) -> None:
+
+        """
+        Blocks until the owner of the CLIPBOARD selection changes or the backend is closed.
+        """
+
+        display = self.__display
+        while not self.closed:
+            while display.pending_events():
+                event = display.next_event()
+                if (event.type, getattr(event, 'sub_code', None)) == display.extension_event.SetSelectionOwnerNotify:
+                    return
+            select.select([display, self.__wake_read], [], [])
+
+    def close(self) -> None:
+
+        """
+        Stops the backend, waking up a pending wait through the wake-up pipe.
+        """
+
+        with self.__lock:
+            super().close()
+            if self.__wake_write is not None:
+                os.write(self.__wake_write, b'\0')
+
+    def _release(self) -> None:
+
+        """
+        Closes the display connection and the wake-up pipe.
+        """
+
+        with self.__lock:
+            if self.__wake_write is None:
+                return
+            os.close(self.__wake_write)
+            os.close(self.__wake_read)
+            self.__wake_write = self.__wake_read = None
+        self.__display.close()
+
+
+class _WaylandBackend(_Backend):
+
+    """
+    Wayland backend. Runs `wl-paste --watch echo`, which prints one line every time the clipboard changes.
+    """
+
+    def __init__(self) -> None:
+
+        """
+        Starts the wl-paste watcher.
+
+        Raises:
+            OSError: Raises this exception if wl-paste is not installed or cannot be started.
+        """
+
+        super().__init__()
+        if (wl_paste := shutil.which('wl-paste')) is None:
+            raise OSError("wl-paste is not installed.")
+        self.__process = subprocess.Popen(
+            [wl_paste, '--watch', 'echo'], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE
+        )
+
+    def wait_for_change(self) -> None:
+
+        """
+        Blocks until wl-paste reports a clipboard change or the backend is closed.
+
+        Raises:
+            OSError: Raises this exception if the wl-paste watcher exits on its own.
+        """
+
+        if not self.__process.stdout.readline() and not self.closed:
+            raise OSError(f"wl-paste exited with code {self.__process.wait()}.")
+
+    def close(self) -> None:
+
+        """
+        Stops the backend, terminating wl-paste so that a pending read sees the end of its output.
+        """
+
+        super().close()
+        if self.__process.poll() is None:
+            self.__process.terminate()
+
+    def _release(self) -> None:
+
+        """
+        Terminates and reaps wl-paste.
+        """
+
+        if self.__process.poll() is None:
+            self.__process.terminate()
+        self.__process.stdout.close()
+        self.__process.wait()
+
+
+class _MacBackend(_PollingBackend):
+
+    """
+    macOS backend. The general pasteboard offers no change notifications, so the backend polls
+    NSPasteboard.changeCount, a plain integer compare, instead of reading the whole clipboard.
+
+    The change count is checked on every polling tick, so the interval backs off while the pasteboard stays unchanged
+    just as with _PollingBackend, and snaps back to MIN_DELAY once the monitor reports a real change.
+    """
+
+    def __init__(self) -> None:
+
+        """
+        Binds the general pasteboard.
+
+        Raises:
+            ImportError: Raises this exception if pyobjc is not installed.
+        """
+
+        from AppKit import NSPasteboard
+
+        super().__init__()
+        self.__pasteboard = NSPasteboard.generalPasteboard()
+        self.__change_count: int = self.__pasteboard.changeCount()
+
+    def wait_for_change(self) -> None:
+
+        """
+        Blocks until the pasteboard's change count advances or the backend is closed.
+        """
+
+        while True:
+            super().wait_for_change()
+            if self.closed:
+                return
+            if (change_count := self.__pasteboard.changeCount()) != self.__change_count:
+                self.__change_count = change_count
+                return
+            self.report(False)
+
+
+class _ClipboardBackend:
+
+    """
+    Base class for reading and writing the clipboard's text.
+
+    Methods:
+        for_platform: Picks the fastest clipboard access available on the running system.
+        paste: Returns the text on the clipboard.
+        copy: Puts the text on the clipboard.
+        close: Releases the resources held for direct clipboard access.
+    """
+
+    @staticmethod
+    def for_platform() -> _ClipboardBackend:
+
+        """
+        Picks the fastest clipboard access available on the running system.
+
+        Returns:
+            _ClipboardBackend: Direct Win32 or X11 access if it can be set up, or _PyperclipClipboard otherwise.
+        """
+
+        if sys.platform == 'win32':
+            candidate: type[_ClipboardBackend] = _Win32Clipboard
+        elif sys.platform != 'darwin' and os.environ.get('DISPLAY') and not os.environ.get('WAYLAND_DISPLAY'):
+            candidate = _X11Clipboard
+        else:
+            return _PyperclipClipboard()
+
+        try:
+            return candidate()
+        except (ImportError, OSError):
+            return _PyperclipClipboard()
+
+    def paste(self) -> str:
+
+        """
+        Returns the text on the clipboard.
+        """
+
+        raise NotImplementedError
+
+    def copy(self, text: str) -> None:
+
+        """
+        Puts the text on the clipboard.
+        """
+
+        raise NotImplementedError
+
+    def close(self) -> None:
+
+        """
+        Releases the resources held for direct clipboard access. Does nothing by default.
+        """
+
+
+class _PyperclipClipboard(_ClipboardBackend):
+
+    """
+    Fallback clipboard access through pyperclip.
+    """
+
+    def paste(self) -> str:
+
+        """
+        Returns the text on the clipboard.
+        """
+
+        return pyperclip.paste()
+
+    def copy(self, text: str) -> None:
+
+        """
+        Puts the text on the clipboard.
+        """
+
+        pyperclip.copy(text)
+
+
+class _Win32Clipboard(_PyperclipClipboard):
+
+    """
+    Windows clipboard access through direct ctypes calls to user32 and kernel32.
+
+    The clipboard is opened on behalf of a hidden message-only window, as EmptyClipboard() would otherwise leave the
+    clipboard without an owner and make SetClipboardData() fail. Once the window is closed, the clipboard is accessed
+    through pyperclip instead.
+    """
+
+    CF_UNICODETEXT: Final[int] = 13
+    GMEM_MOVEABLE: Final[int] = 0x0002
+    OPEN_ATTEMPTS: Final[int] = 50  # The clipboard may be briefly held by another application
+
+    def __init__(self) -> None:
+
+        """
+        Binds the user32 and kernel32 functions and creates the owner window.
+
+        Raises:
+            ImportError: Raises this exception if the Windows API is not available.
+            OSError: Raises this exception if the owner window cannot be created.
+        """
+
+        import ctypes
+        from ctypes import wintypes
+
+        self.__ctypes = ctypes
+        self.__user32 = user32 = ctypes.WinDLL('user32', use_last_error=True)
+        self.__kernel32 = kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        self.__lock = threading.Lock()
+        user32.CreateWindowExW.argtypes = [
+            wintypes.DWORD, wintypes.LPCWSTR, wintypes.LPCWSTR, wintypes.DWORD, ctypes.c_int, ctypes.c_int,
+            ctypes.c_int, ctypes.c_int, wintypes.HWND, wintypes.HMENU, wintypes.HINSTANCE, wintypes.LPVOID
+        ]
+        user32.CreateWindowExW.restype = wintypes.HWND
+        user32.DestroyWindow.argtypes = [wintypes.HWND]
+        user32.DestroyWindow.restype = wintypes.BOOL
+        user32.OpenClipboard.argtypes = [wintypes.HWND]
+        user32.OpenClipboard.restype = wintypes.BOOL
+        user32.CloseClipboard.argtypes = []
+        user32.CloseClipboard.restype = wintypes.BOOL
+        user32.EmptyClipboard.argtypes = []
+        user32.EmptyClipboard.restype = wintypes.BOOL
+        user32.GetClipboardData.argtypes = [wintypes.UINT]
+        user32.GetClipboardData.restype = wintypes.HANDLE
+        user32.SetClipboardData.argtypes = [wintypes.UINT, wintypes.HANDLE]
+        user32.SetClipboardData.restype = wintypes.HANDLE
+        kernel32.GlobalAlloc.argtypes = [wintypes.UINT, ctypes.c_size_t]
+        kernel32.GlobalAlloc.restype = wintypes.HGLOBAL
+        kernel32.GlobalFree.argtypes = [wintypes.HGLOBAL]
+        kernel32.GlobalFree.restype = wintypes.HGLOBAL
+        kernel32.GlobalLock.argtypes = [wintypes.HGLOBAL]
+        kernel32.GlobalLock.restype = wintypes.LPVOID
+        kernel32.GlobalUnlock.argtypes = [wintypes.HGLOBAL]
+        kernel32.GlobalUnlock.restype = wintypes.BOOL
+
+        self.__hwnd: int | None = user32.CreateWindowExW(
+            0, 'STATIC', None, 0, 0, 0, 0, 0, _Win32Backend.HWND_MESSAGE, None, None, None
+        )
+        if not self.__hwnd:
+            raise ctypes.WinError(ctypes.get_last_error())
+        self.__thread_id = threading.get_ident()
+
+    def close(self) -> None:
+
+        """
+        Destroys the owner window. A window can only be destroyed by the thread that created it, so if called from any
+        other thread, the window is left for Windows to destroy once that thread exits.
+        """
+
+        with self.__lock:
+            if self.__hwnd is not None and threading.get_ident() == self.__thread_id:
+                self.__user32.DestroyWindow(self.__hwnd)
+            self.__hwnd = None
+
+    def __open(self) -> None:
+
+        """
+        Opens the clipboard, retrying for a short while if another application holds it.
+
+        Raises:
+            OSError: Raises this exception if the clipboard cannot be opened.
+        """
+
+        for _ in range(self.OPEN_ATTEMPTS):
+            if self.__user32.OpenClipboard(self.__hwnd):
+                return
+            time.sleep(0.01)
+        raise self.__ctypes.WinError(self.__ctypes.get_last_error())
+
+    def paste(self) -> str:
+
+        """
+        Returns the text on the clipboard, or an empty string if there is no text on it.
+
+        Raises:
+            OSError: Raises this exception if the clipboard cannot be opened.
+        """
+
+        with self.__lock:
+            if self.__hwnd is None:
+                return super().paste()
+            self.__open()
+            try:
+                if not (handle := self.__user32.GetClipboardData(self.CF_UNICODETEXT)):
+                    return ""
+                if not (pointer := self.__kernel32.GlobalLock(handle)):
+                    return ""
+                try:
+                    return self.__ctypes.wstring_at(pointer)
+                finally:
+                    self.__kernel32.GlobalUnlock(handle)
+            finally:
+                self.__user32.CloseClipboard()
+
+    def copy(self, text: str) -> None:
+
+        """
+        Puts the text on the clipboard.
+
+        Raises:
+            OSError: Raises this exception if the clipboard cannot be opened or written.
+        """
+
+        ctypes, kernel32 = self.__ctypes, self.__kernel32
+        buffer = ctypes.create_unicode_buffer(text)
+        with self.__lock:
+            if self.__hwnd is None:
+                super().copy(text)
+                return
+            self.__open()
+            try:
+                self.__user32.EmptyClipboard()
+                if not text:
+                    return
+                if not (handle := kernel32.GlobalAlloc(self.GMEM_MOVEABLE, ctypes.sizeof(buffer))):
+                    raise ctypes.WinError(ctypes.get_last_error())
+                if not (pointer := kernel32.GlobalLock(handle)):
+                    error = ctypes.WinError(ctypes.get_last_error())
+                    kernel32.GlobalFree(handle)
+                    raise error
+                ctypes.memmove(pointer, buffer, ctypes.sizeof(buffer))
+                kernel32.GlobalUnlock(handle)
+                if not self.__user32.SetClipboardData(self.CF_UNICODETEXT, handle):  # The clipboard owns it on success
+                    kernel32.GlobalFree(handle)
+                    raise ctypes.WinError(ctypes.get_last_error())
+            finally:
+                self.__user32.CloseClipboard()
+
+
+class _X11Clipboard(_PyperclipClipboard):
+
+    """
+    X11 clipboard access through python-xlib, which reads the CLIPBOARD selection over one display connection kept
+    open for the lifetime of the program instead of spawning an xclip or xsel process per read.
+
+    Owning the selection would mean serving every other client's requests from a dedicated thread, so writes, as well
+    as incremental (INCR) transfers of very large contents, still go through pyperclip. So do reads once the display
+    connection is closed.
+    """
+
+    TIMEOUT: Final[float] = 1.0  # How long to wait for the selection owner to answer, in seconds
+
+    def __init__(self) -> None:
+
+        """
+        Opens the display connection and creates the window the selection is converted to.
+
+        Raises:
+            ImportError: Raises this exception if python-xlib is not installed.
+            OSError: Raises this exception if the display cannot be opened.
+        """
+
+        from Xlib import X, Xatom, display, error
+
+        try:
+            self.__display = display.Display()
+        except error.DisplayError as e:
+            raise OSError(f"Cannot open the X display:\n{e}") from e
+
+        self.__X = X
+        self.__lock = threading.Lock()
+        self.__closed = False
+        screen = self.__display.screen()
+        self.__window = screen.root.create_window(0, 0, 1, 1, 0, screen.root_depth)
+        self.__clipboard = self.__display.intern_atom('CLIPBOARD')
+        self.__utf8_string = self.__display.intern_atom('UTF8_STRING')
+        self.__string = Xatom.STRING
+        self.__incr = self.__display.intern_atom('INCR')
+        self.__property = self.__display.intern_atom('QA_CLIPBOARD_PASTE')
+
+    def close(self) -> None:
+
+        """
+        Closes the display connection, which also destroys the window created on it.
+        """
+
+        with self.__lock:
+            if not self.__closed:
+                self.__closed = True
+                self.__display.close()
+
+    def __convert(self, target: int) -> Any | None:
+
+        """
+        Asks the selection owner to convert the clipboard to the target, and waits for the SelectionNotify event
+        answering the request.
+
+        Returns:
+            Any | None: The SelectionNotify event, or None if the selection owner did not answer in time.
+        """
+
+        display, deadline = self.__display, time.monotonic() + self.TIMEOUT
+        self.__window.convert_selection(self.__clipboard, target, self.__property, self.__X.CurrentTime)
+        display.flush()
+        while True:
+            while display.pending_events():
+                event = display.next_event()
+                if event.type == self.__X.SelectionNotify and event.requestor.id == self.__window.id:
+                    return event
+            if (timeout := deadline - time.monotonic()) <= 0:
+                return None
+            select.select([display], [], [], timeout)
+
+    def paste(self) -> str:
+
+        """
+        Returns the text on the clipboard, or an empty string if there is no text on it. Owners that refuse
+        UTF8_STRING are asked for Latin-1 encoded STRING instead.
+        """
+
+        X, encoding = self.__X, 'utf-8'
+        with self.__lock:
+            if self.__closed:
+                return super().paste()
+            if self.__display.get_selection_owner(self.__clipboard) == X.NONE:
+                return ""
+            if (event := self.__convert(self.__utf8_string)) is not None and event.property == X.NONE:
+                event, encoding = self.__convert(self.__string), 'latin-1'
+            if event is None or event.property == X.NONE:
+                return ""
+            reply = self.__window.get_full_property(self.__property, X.AnyPropertyType)
+            self.__window.delete_property(self.__property)
+            self.__display.flush()
+
+        if reply is None:
+            return ""
+        if reply.property_type == self.__incr:
+            return super().paste()
+        return reply.value.decode(encoding, errors='replace')
+
+
+def _sequence_number_source() -> Callable[[], int]:
+
+    """
+    Resolves the cheapest way of telling whether the clipboard has changed without reading it.
+
+    Returns:
+        Callable[[], int]: A function returning a number that advances whenever the clipboard contents change. It is
+        bound to GetClipboardSequenceNumber on Windows and to NSPasteboard.changeCount on macOS. Elsewhere a counter
+        advancing on every call is returned, so every check falls through to reading the clipboard.
+    """
+
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        get_clipboard_sequence_number = ctypes.WinDLL('user32').GetClipboardSequenceNumber
+        get_clipboard_sequence_number.argtypes = []
+        get_clipboard_sequence_number.restype = wintypes.DWORD
+        return get_clipboard_sequence_number
+
+    if sys.platform == 'darwin':
+        try:
+            from AppKit import NSPasteboard
+        except ImportError:
+            pass
+        else:
+            return NSPasteboard.generalPasteboard().changeCount
+
+    return itertools.count().__next__
+
+
+class _MonitorCore:
+
+    """
+    Decides what to do with freshly read clipboard contents. The clipboard itself is read and written by the caller.
+
+    This is the pure Python counterpart of _qa_fast.FastMonitor, used when the extension is not built.
+
+    Attributes:
+        prev_data (str): The lately saved clipboard contents.
+    """
+
+    __slots__ = ('__resolve', '__max_len', 'prev_data')
+
+    def __init__(self, resolve: Callable[[str], str | None], max_len: int, prev_data: str) -> None:
+
+        """
+        Initializes _MonitorCore with the resolver of clipboard contents, the length of the longest question and the
+        clipboard contents seen at startup.
+        """
+
+        self.__resolve: Final[Callable[[str], str | None]] = resolve
+        self.__max_len: Final[int] = max_len
+        self.prev_data: str = prev_data
+
+    def tick(self, new_data: str) -> bool | str:
+
+        """
+        Processes freshly read clipboard contents.
+
+        Returns:
+            bool | str: False if the contents have not changed, True if they have but there is nothing to copy, or
+            the answer to put on the clipboard.
+        """
+
+        if new_data == self.prev_data:
+            return False
+        self.prev_data = new_data
+
+        # Nothing longer than the longest question can match
+        if len(new_data) > self.__max_len:
+            return True
+        if (answer := self.__resolve(new_data)) is None:
+            return True
+        self.prev_data = answer  # The answer about to be copied must not count as a change
+        return answer
 
 
 class ClipboardMonitor:
@@ -15,9 +962,12 @@ class ClipboardMonitor:
     A class to monitor and interact with the system's clipboard.
 
     The ClipboardMonitor class automates the replacement of copied text with predefined answers if the copied text
-    matches the questions from a provided dictionary. The class is equipped with methods for getting/setting the
-    previous clipboard contents, monitoring the clipboard, and checking and updating clipboard content if it matches
-    questions from the predefined dictionary. The monitoring process can be stopped by using a keyboard interrupt.
+    matches the questions from a provided dictionary. The class is equipped with methods for monitoring the clipboard,
+    and checking and updating clipboard content if it matches questions from the predefined dictionary. The monitoring
+    process runs as an asyncio coroutine and can be stopped by cancelling it or by using a keyboard interrupt.
+
+    Attributes:
+        prev_data (str): The lately saved clipboard contents.
 
     Methods:
         check_clipboard: Checks the clipboard for any new data, if found, matches it with dict_qa and replaces it with
@@ -26,9 +976,10 @@ class ClipboardMonitor:
 
     Raises:
         TypeError: If dict_qa provided is not a dictionary or any element in the dictionary is not a string.
-                   Also, if the type of value for prev_data setter is not a string.
     """
 
+    TRIE_THRESHOLD: Final[int] = 1000  # Tables larger than this are looked up through a trie if marisa-trie is installed
+
     def __init__(self, dict_qa: dict[str, str]) -> None:
 
         """
@@ -36,26 +987,46 @@ class ClipboardMonitor:
 
         Raises:
             TypeError: Raises this exception if the dict_qa type is not a dictionary or if any element in the dictionary
-             is not a string
-        """
-
-        if isinstance(dict_qa, dict):
-            for possible_question, possible_answer in dict_qa.items():
-                if isinstance(possible_question, str):
-                    pass
-                else:
-                    raise TypeError(f"question type should match {str}. {type(possible_question)} given instead.")
-                if isinstance(possible_answer, str):
-                    pass
-                else:
-                    raise TypeError(f"answer type should match {str}. {type(possible_answer)} given instead.")
-        else:
-            raise TypeError(f"dict_qa type should match {dict}. {type(dict_qa)} given instead.")
+             is not a string. The check is only performed when __debug__ is set.
+        """
 
+        # The validation is skipped entirely when running with -O
+        if __debug__:
+            if not isinstance(dict_qa, dict):
+                raise TypeError(f"dict_qa type should match {dict}. {type(dict_qa)} given instead.")
+            bad_pair = next(
+                ((question, answer) for question, answer in dict_qa.items()
+                 if type(question) is not str or type(answer) is not str),
+                None
+            )
+            if bad_pair is not None:
+                if type(bad_pair[0]) is not str:
+                    raise TypeError(f"question type should match {str}. {type(bad_pair[0])} given instead.")
+                raise TypeError(f"answer type should match {str}. {type(bad_pair[1])} given instead.")
+
+        # The caller's dictionary is kept as is rather than copied, so the lookup structures are the only QA storage
+        # the monitor adds
         self.__dict_qa: Final[dict[str, str]] = dict_qa
-        self.__answers: Final[set[str]] = set(dict_qa.values())
-        self.__prev_data: str = str()
-        pyperclip.copy(str())  # Clearing the clipboard
+        # Our own writes are recognised by stamping prev_data and the sequence number, so answers need no lookup.
+        # Questions that are answers themselves are left out, as copying an answer never triggers a replacement.
+        # Strings are interned at build time only, so equal answers share one object. Clipboard contents are not
+        # interned: probing the interned-string table would cost more per check than it saves, and would keep every
+        # string copied alive
+        answers = set(dict_qa.values())
+        lookup = {
+            sys.intern(question): sys.intern(answer) for question, answer in dict_qa.items() if question not in answers
+        }
+        del answers
+        self.__max_len: Final[int] = max(map(len, lookup), default=0)
+        self.__resolve: Final[Callable[[str], str | None]] = self.__build_resolver(lookup)
+        self.__current_seq: Final[Callable[[], int]] = _sequence_number_source()
+        seq = self.__current_seq()
+        self.__clipboard: Final[_ClipboardBackend] = _ClipboardBackend.for_platform()
+        # Whatever is on the clipboard at startup counts as already seen, so the first check is a no-op
+        self.__core: Final[_MonitorCore] = (FastMonitor or _MonitorCore)(
+            self.__resolve, self.__max_len, self.__clipboard.paste()
+        )
+        self.__check: Final[Callable[[], Awaitable[bool]]] = self.__specialize(seq)
 
     @property
     def dict_qa(self) -> dict[str, str]:
@@ -64,7 +1035,7 @@ class ClipboardMonitor:
         Getter for the self.__dict_qa attribute.
 
         Returns:
-            self.__dict_qa (dict[str, str]): The dictionary of questions and answers.
+            self.__dict_qa (dict[str, str]): The dictionary of questions and answers the monitor was created with.
         """
 
         return self.__dict_qa
@@ -73,76 +1044,150 @@ class ClipboardMonitor:
     def prev_data(self) -> str:
 
         """
-        Getter for the self.__prev_data attribute.
+        Getter for the lately saved clipboard contents.
 
         Returns:
-            self.__prev_data (str): The lately saved clipboard contents as a string.
-
+            str: The lately saved clipboard contents.
         """
 
-        return self.__prev_data
+        return self.__core.prev_data
 
-    @prev_data.setter
-    def prev_data(self, value: str) -> None:
+    @classmethod
+    def __build_resolver(cls, lookup: dict[str, str]) -> Callable[[str], str | None]:
 
         """
-        Setter for the self.__prev_data attribute.
+        Builds the function resolving clipboard contents to their answers.
 
-        Raises:
-            TypeError: An exception is thrown if the new value type is not str.
+        Returns:
+            Callable[[str], str | None]: lookup.get for small tables, which a cache in front of it would only slow
+            down, as the cache hashes and probes a dictionary of its own before calling it. For tables larger than
+            TRIE_THRESHOLD, and when marisa-trie is installed, a function probing a marisa_trie.Trie of the keys, which
+            takes a fraction of the memory of the lookup table it replaces. The lookup table is released once the
+            resolver is built, but the caller's dict_qa is not: it stays reachable through the dict_qa property (and
+            Main.dict_qa), so the saving covers the monitor's own table only. Each key id indexes an array of indices
+            into a pool of distinct answers, so within the resolver questions sharing an answer cost 4 bytes each
+            rather than a reference per key. The caller's dict_qa still holds its own reference per question.
+
+        Notes:
+            The dictionary needs no such pool, since its answers are interned and equal answers already share a single
+            string object.
+
+            The trie resolver is memoized, as a trie walk costs more than a dictionary probe. The lookup table is
+            built once and never mutated, so the cache never goes stale.
+
+            marisa-trie encodes keys as UTF-8, so clipboard contents holding lone surrogates, which a dictionary
+            probe handles fine, resolve to None instead of raising UnicodeEncodeError. A table whose questions hold
+            any keeps the dictionary.
         """
 
-        if isinstance(value, str):
-            self.__prev_data = value
-        else:
-            raise TypeError(f"value type should match {str}. {type(value)} given instead.")
+        if marisa_trie is None or len(lookup) <= cls.TRIE_THRESHOLD:
+            return lookup.get
 
-    @property
-    def answers(self) -> set[str]:
+        try:
+            keys = marisa_trie.Trie(lookup.keys())
+        except UnicodeEncodeError:  # A question holding lone surrogates, which only a dictionary can store
+            return lookup.get
+        pool: list[str] = []
+        pool_ids: dict[str, int] = {}
+        answer_ids = array('I', [0]) * len(keys)
+        for key, answer in lookup.items():
+            if (answer_id := pool_ids.setdefault(answer, len(pool))) == len(pool):
+                pool.append(answer)
+            answer_ids[keys.key_id(key)] = answer_id
+        del pool_ids
+
+        @lru_cache(maxsize=256)
+        def resolve(new_data: str) -> str | None:
+            try:
+                key_id = keys.get(new_data)
+            except UnicodeEncodeError:  # Lone surrogates, which no key can hold
+                return None
+            return None if key_id is None else pool[answer_ids[key_id]]
+
+        return resolve
+
+    def __specialize(self, seq: int) -> Callable[[], Awaitable[bool]]:
 
         """
-        Getter for the self.__answers attribute
+        Builds the clipboard check specialized for this monitor. Everything the check needs is bound once into the
+        closure, so a check performs no attribute or global lookups. Deciding what to do with the clipboard contents is
+        left to _qa_fast.FastMonitor when the extension is built, and to _MonitorCore otherwise.
+
+        Returns:
+            Callable[[], Awaitable[bool]]: The coroutine function behind check_clipboard().
         """
 
-        return self.__answers
+        current_seq = self.__current_seq
+        paste, copy = self.__clipboard.paste, self.__clipboard.copy
+        tick = self.__core.tick
+        get_running_loop = asyncio.get_running_loop
+
+        async def check() -> bool:
+            nonlocal seq
+            run_in_executor = get_running_loop().run_in_executor
 
-    def check_clipboard(self) -> None:
+            # Skips reading the clipboard if its sequence number has not advanced since the last check
+            if (new_seq := current_seq()) == seq:
+                return False
+            seq = new_seq
+
+            if (answer := tick(await run_in_executor(None, paste))) is False or answer is True:
+                return answer  # Unchanged, or changed with nothing to copy
+            await run_in_executor(None, copy, answer)
+            seq = current_seq()  # Our own write must not count as a change
+            return True
+
+        return check
+
+    async def check_clipboard(self) -> bool:
 
         """
         Checks clipboard for any new data, if found matches with dict_qa and replaces with appropriate answer.
+        The clipboard is read and written in the default executor, as both may block on the OS clipboard lock.
+
+        Returns:
+            bool: True if the clipboard contents have changed since the last check, False otherwise.
         """
 
-        # Checks if the clipboard contents have changed
-        if (new_data := pyperclip.paste()) != self.prev_data:
-            self.prev_data: str = new_data
-            if self.prev_data in self.answers:
-                return
-            pyperclip.copy(self.dict_qa.get(new_data, 'NA'))
+        return await self.__check()
 
-    def start_monitoring(self) -> None:
+    async def start_monitoring(self) -> None:
 
         """
-        Starts monitoring the clipboard.
+        Starts monitoring the clipboard. The clipboard is only checked when the platform backend reports a change.
+        Monitoring goes on until the coroutine is cancelled, after which the direct clipboard access is released and
+        the monitor falls back to pyperclip.
         """
 
-        while True:
-            try:
-                self.check_clipboard()
-                time.sleep(0.5)  # Reduces CPU usage by waiting for 0.5 seconds before checking clipboard again
-            except KeyboardInterrupt:
-                break
+        backend = _Backend.for_platform()
+        check, report = self.__check, backend.report
+        try:
+            async for _ in backend.async_events():
+                report(await check())
+        finally:
+            self.__clipboard.close()
+
+
+_DICT_QA_PATH: Final[str] = 'dict_qa.txt'
+_DICT_QA_CACHE_PATH: Final[str] = 'dict_qa.cache'
+_DICT_QA_MODULE_PATH: Final[str] = os.path.join(os.path.dirname(_DICT_QA_PATH), 'dict_qa.py')
 
 
 class _Main(type):
 
     """
     A metaclass for initialization of the Q and A.
-    For performance reasons such a data should be initialized during compile-time.
+    For performance reasons such a data should be initialized during compile-time, which build_dict.py does by
+    precompiling the QA file into the dict_qa module.
 
     Methods:
         __new__(mcs, name, bases, attrs): The constructor creating a new class attribute for the class inheriting from
         the _Main metaclass
         __dict_init(): The private method responsible for the initialization of the QA dictionary
+        __load_compiled(st): The private method loading the QA dictionary from the precompiled dict_qa module
+        __parse(): The private method parsing the QA file
+        __load_cache(st): The private method loading the QA dictionary from its marshal cache
+        __store_cache(st, dict_qa): The private method saving the QA dictionary to its marshal cache
     """
 
     def __new__(mcs, name: Any, bases: Any, attrs: dict) -> _Main:
@@ -173,15 +1218,132 @@ class _Main(type):
                     "What is the capital of England?": 'London'
                 }
 
-            The choice of the use of single or double quotes does not matter as either is correct.
+            The choice of the use of single or double quotes does not matter as either is correct, and quotes of the
+            other kind may appear inside the strings (e.g. "don't").
+
+            The parsed dictionary is cached next to the QA file and reused for as long as the file's modification
+            time and size stay the same. The dict_qa module generated by build_dict.py takes precedence over both.
 
         """
 
         try:
-            with open('dict_qa.txt', 'r') as file:
-                return dict(json.loads(file.read().replace("'", '"')))
-        except (FileNotFoundError, TypeError) as e:
+            st = os.stat(_DICT_QA_PATH)
+        except FileNotFoundError:
+            st = None
+        if (dict_qa := _Main.__load_compiled(st)) is not None:
+            return dict_qa
+
+        try:
+            if st is None:
+                st = os.stat(_DICT_QA_PATH)
+            if (dict_qa := _Main.__load_cache(st)) is not None:
+                return dict_qa
+            dict_qa = _Main.__parse()
+        except (FileNotFoundError, TypeError, SyntaxError) as e:
             raise ValueError(f"No QA initialized. An exception occurred:\n{e}")
+        _Main.__store_cache(st, dict_qa)
+        return dict_qa
+
+    @staticmethod
+    def __load_compiled(st: os.stat_result | None) -> dict[str, str] | None:
+
+        """
+        Method for loading the QA dictionary from the dict_qa module precompiled by build_dict.py. The module is
+        loaded from next to the QA file rather than from sys.path, and loading it only unmarshals its cached bytecode,
+        so no parsing happens at all.
+
+        Returns:
+            dict[str, str] | None: the precompiled dictionary of QA, or None if the module is missing or was built from
+            another version of the QA file
+        """
+
+        if not os.path.isfile(_DICT_QA_MODULE_PATH):
+            return None
+        try:
+            spec = importlib.util.spec_from_file_location('dict_qa', _DICT_QA_MODULE_PATH)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            dict_qa, source_stat = module.DICT_QA, module.SOURCE_STAT
+        except (OSError, ImportError, SyntaxError, AttributeError):
+            return None
+        if st is not None and source_stat != (st.st_mtime_ns, st.st_size):
+            return None
+        return dict_qa
+
+    @staticmethod
+    def __parse() -> dict[str, str]:
+
+        """
+        Method for parsing the QA file
+
+        Returns:
+            dict[str, str]: the dictionary of QA
+
+        Notes:
+            If ijson is installed, a JSON object is stream-parsed from a memory map, so the file's text is never held
+            in memory as a whole. Otherwise the file is decoded as JSON, so escapes such as surrogate pairs written by
+            json.dump decode the same way either way. Only a file that is not valid JSON (e.g. it uses single quotes)
+            is parsed as a Python literal.
+        """
+
+        if ijson is not None:
+            try:
+                with open(_DICT_QA_PATH, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    # kvitems() silently yields nothing for any other top-level value, so the first event is checked
+                    if next(ijson.parse(mm), (None, None, None))[1] == 'start_map':
+                        mm.seek(0)
+                        return dict(ijson.kvitems(mm, '', use_float=True))
+            except (ijson.JSONError, ValueError):  # Not JSON, or an empty file that cannot be mapped
+                pass
+
+        with open(_DICT_QA_PATH, 'r', encoding='utf-8') as file:
+            text = file.read()
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            data = ast.literal_eval(text)
+        return data if isinstance(data, dict) else dict(data)
+
+    @staticmethod
+    def __load_cache(st: os.stat_result) -> dict[str, str] | None:
+
+        """
+        Method for loading the QA dictionary from its marshal cache
+
+        Returns:
+            dict[str, str] | None: the cached dictionary of QA, or None if the cache is missing, corrupted or was
+            written for another version of the QA file
+        """
+
+        try:
+            with open(_DICT_QA_CACHE_PATH, 'rb') as file:
+                if marshal.load(file) != (st.st_mtime_ns, st.st_size):
+                    return None
+                dict_qa = marshal.load(file)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        return dict_qa if isinstance(dict_qa, dict) else None
+
+    @staticmethod
+    def __store_cache(st: os.stat_result, dict_qa: dict[str, str]) -> None:
+
+        """
+        Method for saving the QA dictionary to its marshal cache. The cache is written to a temporary file first and
+        then moved into place, so a concurrent start never reads a partially written cache. Failing to write the cache
+        is not an error, as it only costs the next start a reparse.
+        """
+
+        tmp_path = f"{_DICT_QA_CACHE_PATH}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as file:
+                marshal.dump((st.st_mtime_ns, st.st_size), file)
+                marshal.dump(dict_qa, file)
+            os.replace(tmp_path, _DICT_QA_CACHE_PATH)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
 
 
 class Main(metaclass=_Main):
@@ -195,6 +1357,7 @@ class Main(metaclass=_Main):
     Methods:
         main(): The main method for the whole program execution.
         The whole program should be executed within this method.
+        __monitor(dict_qa): The private coroutine monitoring the clipboard until SIGINT is received
     """
 
     dict_qa: Final[dict[str, str]] = ...
@@ -204,11 +1367,57 @@ class Main(metaclass=_Main):
 
         """
         The main method for the whole program execution.
-        Initializes ClipboardMonitor object and uses ClipboardMonitor().start_monitoring() method for automation of
-        Q and A.
+        Initializes ClipboardMonitor object and runs ClipboardMonitor().start_monitoring() coroutine for automation of
+        Q and A until a keyboard interrupt.
+        """
+
+        asyncio.run(cls.__monitor(cls.dict_qa))
+
+    @staticmethod
+    async def __monitor(dict_qa: dict[str, str]) -> None:
+
         """
+        Runs ClipboardMonitor().start_monitoring() until SIGINT is received, which makes it return normally.
 
-        ClipboardMonitor(cls.dict_qa).start_monitoring()
+        The SIGINT handler cancels the monitoring task. It is installed once for the whole run, so the monitoring loop
+        itself sets up no exception handling per change, and it is installed here rather than by ClipboardMonitor, so
+        that a monitor embedded in another event loop or thread leaves the process-wide handler alone. Where no handler
+        can be installed, e.g. off the main thread, SIGINT keeps its default behaviour.
+        """
+
+        loop = asyncio.get_running_loop()
+        task = asyncio.ensure_future(ClipboardMonitor(dict_qa).start_monitoring())
+        stopping = False
+
+        def stop() -> None:
+            nonlocal stopping
+            stopping = True
+            task.cancel()
+
+        loop_handler = signal_handler = False
+        previous_handler = None
+        try:
+            loop.add_signal_handler(signal.SIGINT, stop)
+            loop_handler = True
+        except NotImplementedError:  # Windows event loops do not support signal handlers
+            try:
+                previous_handler = signal.signal(signal.SIGINT, lambda *_: loop.call_soon_threadsafe(stop))
+                signal_handler = True
+            except ValueError:  # Not on the main thread
+                pass
+        except (RuntimeError, ValueError):  # Not on the main thread
+            pass
+
+        try:
+            await task
+        except asyncio.CancelledError:
+            if not stopping:
+                raise
+        finally:
+            if loop_handler:
+                loop.remove_signal_handler(signal.SIGINT)
+            elif signal_handler:
+                signal.signal(signal.SIGINT, previous_handler if previous_handler is not None else signal.SIG_DFL)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,55 @@
+# cython: language_level=3
+"""
+Compiled core of ClipboardMonitor, built with `python setup.py build_ext --inplace`
+
+QAClipboard falls back to the equivalent pure Python _MonitorCore class when this extension is not built.
+"""
+
+
+cdef class FastMonitor:
+
+    """
+    Decides what to do with freshly read clipboard contents. The clipboard itself is read and written by the caller.
+
+    Attributes:
+        prev_data (str): The lately saved clipboard contents.
+    """
+
+    cdef object _resolve
+    cdef Py_ssize_t _max_len
+    cdef public str prev_data
+
+    def __init__(self, resolve, Py_ssize_t max_len, str prev_data):
+
+        """
+        Initializes FastMonitor with the resolver of clipboard contents, the length of the longest question and the
+        clipboard contents seen at startup.
+        """
+
+        self._resolve = resolve
+        self._max_len = max_len
+        self.prev_data = prev_data
+
+    cpdef object tick(self, str new_data):
+
+        """
+        Processes freshly read clipboard contents.
+
+        Returns:
+            bool | str: False if the contents have not changed, True if they have but there is nothing to copy, or
+            the answer to put on the clipboard.
+        """
+
+        cdef object answer
+        if new_data == self.prev_data:
+            return False
+        self.prev_data = new_data
+
+        # Nothing longer than the longest question can match
+        if len(new_data) > self._max_len:
+            return True
+        answer = self._resolve(new_data)
+        if answer is None:
+            return True
+        self.prev_data = answer  # The answer about to be copied must not count as a change
+        return answer
@@ -0,0 +1,32 @@
+"""
+Build step precompiling the QA file into the dict_qa module
+
+Running this script next to dict_qa.txt writes dict_qa.py, holding the QA dictionary as a Python literal. The program
+then imports it instead of parsing dict_qa.txt, which CPython serves from the module's cached bytecode. The module
+records the modification time and size of the QA file it was built from, and is ignored once the QA file changes, so
+the script only has to be rerun to bring the speedup back after editing the QA file.
+"""
+
+from __future__ import annotations
+import os
+from QAClipboard import Main, _DICT_QA_MODULE_PATH, _DICT_QA_PATH
+
+
+def build() -> None:
+
+    """
+    Writes the dict_qa module from the QA file. The module is written to a temporary file first and then moved into
+    place, so the program never imports a partially written module.
+    """
+
+    st = os.stat(_DICT_QA_PATH)
+    tmp_path = f"{_DICT_QA_MODULE_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        file.write(f'"""\nGenerated by build_dict.py from {_DICT_QA_PATH}. Do not edit.\n"""\n\n')
+        file.write(f"SOURCE_STAT = {(st.st_mtime_ns, st.st_size)!r}\n")
+        file.write(f"DICT_QA = {dict(Main.dict_qa)!r}\n")
+    os.replace(tmp_path, _DICT_QA_MODULE_PATH)
+
+
+if __name__ == "__main__":
+    build()
@@ -0,0 +1,11 @@
+"""
+Builds the optional _qa_fast extension in place: python setup.py build_ext --inplace
+"""
+
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name='QAClipboard',
+    ext_modules=cythonize('_qa_fast.pyx', language_level=3),
+)
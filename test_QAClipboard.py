@@ -0,0 +1,134 @@
+"""
+Tests for QAClipboard, run with: python -m pytest
+"""
+
+import asyncio
+import importlib
+import os
+import threading
+
+import pytest
+
+pytest.importorskip('pyperclip')
+
+
+@pytest.fixture(scope='module')
+def qa(tmp_path_factory):
+
+    """
+    Imports QAClipboard, which loads dict_qa.txt from the working directory at import time.
+    """
+
+    directory = tmp_path_factory.mktemp('qa')
+    (directory / 'dict_qa.txt').write_text('{"Q": "A"}', encoding='utf-8')
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        return importlib.import_module('QAClipboard')
+    finally:
+        os.chdir(cwd)
+
+
+def _cores(qa):
+    cores = [qa._MonitorCore]
+    if qa.FastMonitor is not None:
+        cores.append(qa.FastMonitor)
+    return cores
+
+
+def _write_qa(path, text, mtime_ns=None):
+    path.write_text(text, encoding='utf-8')
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_tick(qa):
+    for core_type in _cores(qa):
+        core = core_type({'Q': 'A', 'Long question': 'B'}.get, len('Long question'), 'start')
+        results = [core.tick(data) for data in ('start', 'Q', 'A', 'x', 'x' * 20, 'Long question', 'B')]
+        assert results == [False, 'A', False, True, True, 'B', False], core_type
+        assert core.prev_data == 'B'
+
+
+def test_tick_parity(qa):
+    fast = pytest.importorskip('_qa_fast')
+    lookup = {'Q1': 'A1', 'Q2': 'A2'}
+    sequence = ['', 'Q1', 'A1', 'Q1', 'other', 'Q2', 'Q2', 'A1', 'a' * 10, '']
+    slow_core = qa._MonitorCore(lookup.get, 2, '')
+    fast_core = fast.FastMonitor(lookup.get, 2, '')
+    for data in sequence:
+        assert slow_core.tick(data) == fast_core.tick(data), data
+        assert slow_core.prev_data == fast_core.prev_data
+
+
+def test_cache_is_keyed_on_mtime_and_size(qa, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / 'dict_qa.txt'
+    _write_qa(path, '{"Q": "A"}', 10 ** 18)
+    assert qa._Main._Main__dict_init() == {'Q': 'A'}
+    assert (tmp_path / 'dict_qa.cache').is_file()
+
+    # Same size and modification time: the cached dictionary is reused
+    _write_qa(path, '{"Q": "B"}', 10 ** 18)
+    assert qa._Main._Main__dict_init() == {'Q': 'A'}
+
+    _write_qa(path, '{"Q": "B"}', 10 ** 18 + 1)
+    assert qa._Main._Main__dict_init() == {'Q': 'B'}
+    _write_qa(path, '{"Q": "Bb"}', 10 ** 18 + 1)
+    assert qa._Main._Main__dict_init() == {'Q': 'Bb'}
+
+
+def test_compiled_module_is_keyed_on_mtime_and_size(qa, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / 'dict_qa.txt'
+    _write_qa(path, '{"Q": "A"}', 10 ** 18)
+    st = os.stat(path)
+    module = "SOURCE_STAT = {!r}\nDICT_QA = {{'Q': 'compiled'}}\n"
+    (tmp_path / 'dict_qa.py').write_text(module.format((st.st_mtime_ns, st.st_size)), encoding='utf-8')
+    assert qa._Main._Main__dict_init() == {'Q': 'compiled'}
+
+    _write_qa(path, '{"Q": "A"}', 10 ** 18 + 1)
+    assert qa._Main._Main__dict_init() == {'Q': 'A'}
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('{"Q": "A"}', {'Q': 'A'}),
+    ("{'Q': \"don't\"}", {'Q': "don't"}),
+    ('[["Q1", "A1"], ["Q2", "A2"]]', {'Q1': 'A1', 'Q2': 'A2'}),
+    ('{"Q\\ud83d\\ude00": "A"}', {'Q\U0001F600': 'A'}),
+])
+def test_parse(qa, tmp_path, monkeypatch, text, expected):
+    monkeypatch.chdir(tmp_path)
+    _write_qa(tmp_path / 'dict_qa.txt', text)
+    assert qa._Main._Main__dict_init() == expected
+
+
+def test_parse_empty_file(qa, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _write_qa(tmp_path / 'dict_qa.txt', '')
+    with pytest.raises(ValueError):
+        qa._Main._Main__dict_init()
+
+
+def test_polling_backend_shutdown(qa):
+    released = []
+
+    class Backend(qa._PollingBackend):
+        def _release(self):
+            released.append(threading.current_thread().name)
+
+    async def consume(backend):
+        events = backend.async_events()
+        for _ in range(3):
+            await events.__anext__()
+            backend.report(False)
+        await events.aclose()
+
+    backend = Backend()
+    asyncio.run(consume(backend))
+    assert backend.closed
+    for thread in threading.enumerate():
+        if thread.name == 'Backend-watcher':
+            thread.join(1)
+            assert not thread.is_alive()
+    assert released == ['Backend-watcher']